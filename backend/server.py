@@ -1,20 +1,33 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Query, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
 import logging
+import asyncio
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter
 from typing import List, Optional
 import uuid
 import hashlib
+import hmac
+import math
+import base64
 import time
 from datetime import datetime, timezone, timedelta
 import json
+import csv
+import io
+import itertools
+import numpy as np
 import bcrypt
 import jwt
+import orjson
+from cachetools import TTLCache
 from enum import Enum
 
 ROOT_DIR = Path(__file__).parent
@@ -22,11 +35,11 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
-# Create the main app without a prefix
-app = FastAPI()
+# Create the main app without a prefix; orjson handles response serialization
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -36,17 +49,24 @@ SECRET_KEY = "ecotrack_secret_key_change_in_production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+def base64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+# HS256 signing state built once; create_access_token only clones and feeds it
+JWT_HEADER_SEGMENT = base64url_encode(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"}))
+jwt_signer = hmac.new(SECRET_KEY.encode('utf-8'), digestmod=hashlib.sha256)
+
+# bcrypt work factor (pinned explicitly so the hashing cost is auditable)
+BCRYPT_ROUNDS = 12
+
 security = HTTPBearer()
 
-# Carbon emission factors (kg CO2 per km)
-EMISSION_FACTORS = {
-    "car": 0.21,
-    "bus": 0.089,
-    "train": 0.041,
-    "flight": 0.255,
-    "walking": 0.0,
-    "cycling": 0.0
-}
+# Activity pagination cursors carry dates as milliseconds since EPOCH (BSON date precision)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Verified-token cache: SHA-256(token) -> (User, expires_at)
+TOKEN_CACHE_TTL_SECONDS = 5
+token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL_SECONDS)
 
 class TransportType(str, Enum):
     CAR = "car"
@@ -56,6 +76,21 @@ class TransportType(str, Enum):
     WALKING = "walking"
     CYCLING = "cycling"
 
+# Carbon emission factors (kg CO2 per km)
+EMISSION_FACTORS = {
+    TransportType.CAR: 0.21,
+    TransportType.BUS: 0.089,
+    TransportType.TRAIN: 0.041,
+    TransportType.FLIGHT: 0.255,
+    TransportType.WALKING: 0.0,
+    TransportType.CYCLING: 0.0
+}
+
+# Factors laid out by transport code (enum declaration order) for vectorized imports
+TRANSPORT_TYPES = tuple(TransportType)
+TRANSPORT_CODES = {transport_type.value: code for code, transport_type in enumerate(TRANSPORT_TYPES)}
+EMISSION_FACTOR_ARRAY = np.array([EMISSION_FACTORS[transport_type] for transport_type in TRANSPORT_TYPES])
+
 # Models
 class UserCreate(BaseModel):
     email: EmailStr
@@ -74,7 +109,7 @@ class User(BaseModel):
 
 class ActivityCreate(BaseModel):
     transport_type: TransportType
-    distance_km: float
+    distance_km: float = Field(ge=0, allow_inf_nan=False)
     date: datetime
     description: Optional[str] = None
 
@@ -88,6 +123,15 @@ class Activity(BaseModel):
     description: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# Most activities a single bulk request or CSV import may create
+MAX_BULK_ACTIVITIES = 1000
+
+class ActivityBulk(BaseModel):
+    items: List[ActivityCreate] = Field(max_length=MAX_BULK_ACTIVITIES)
+
+# Validates and serializes whole activity lists in pydantic-core
+ACTIVITY_LIST = TypeAdapter(List[Activity])
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -99,8 +143,9 @@ class DashboardStats(BaseModel):
     current_month_emissions: float
 
 # Utility Functions
+# bcrypt is deliberately slow; call these via asyncio.to_thread from request handlers
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
 
 def verify_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
@@ -108,67 +153,153 @@ def verify_password(password: str, hashed_password: str) -> bool:
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    to_encode.update({"exp": int(expire.timestamp())})
+    signing_input = JWT_HEADER_SEGMENT + b"." + base64url_encode(orjson.dumps(to_encode))
+    signer = jwt_signer.copy()
+    signer.update(signing_input)
+    encoded_jwt = signing_input + b"." + base64url_encode(signer.digest())
+    return encoded_jwt.decode('ascii')
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    cache_key = hashlib.sha256(token.encode('utf-8')).digest()
+    cached = token_cache.get(cache_key)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
         
-        user = await db.users.find_one({"id": user_id})
+        # Skip the password hash and _id; only the public User fields are needed
+        user = await db.users.find_one({"id": user_id}, {"id": 1, "email": 1, "name": 1, "created_at": 1, "_id": 0})
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         
-        return User(**user)
+        current_user = User(**user)
+        # Never serve a cached entry past the token's own expiry
+        token_cache[cache_key] = (current_user, min(payload["exp"], time.time() + TOKEN_CACHE_TTL_SECONDS))
+        return current_user
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
 
 def calculate_carbon_footprint(transport_type: TransportType, distance_km: float) -> float:
     """Calculate carbon footprint based on transport type and distance"""
-    emission_factor = EMISSION_FACTORS.get(transport_type.value, 0)
-    return round(emission_factor * distance_km, 3)
-
-def prepare_for_mongo(data):
-    """Convert datetime objects to ISO strings for MongoDB storage"""
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
-    return data
-
-def parse_from_mongo(item):
-    """Convert ISO strings back to datetime objects"""
-    if isinstance(item, dict):
-        for key, value in item.items():
-            if key in ['date', 'created_at'] and isinstance(value, str):
-                try:
-                    item[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                except:
-                    pass
-    return item
+    return round(EMISSION_FACTORS[transport_type] * distance_km, 3)
+
+def build_activity(user_id: str, activity_data: ActivityCreate) -> Activity:
+    """Build an Activity for a user, computing its carbon footprint"""
+    return Activity(
+        user_id=user_id,
+        transport_type=activity_data.transport_type,
+        distance_km=activity_data.distance_km,
+        carbon_footprint_kg=calculate_carbon_footprint(activity_data.transport_type, activity_data.distance_km),
+        date=activity_data.date,
+        description=activity_data.description
+    )
+
+def activity_cursor(activity: dict) -> str:
+    """Encode an activity's (date, id) sort position as an opaque pagination cursor"""
+    epoch_ms = (activity["date"] - EPOCH) // timedelta(milliseconds=1)
+    return f"{epoch_ms}:{activity['id']}"
+
+def parse_activity_cursor(cursor: str):
+    """Decode a cursor produced by activity_cursor back into (date, id)"""
+    epoch_ms, _, activity_id = cursor.partition(":")
+    try:
+        return EPOCH + timedelta(milliseconds=int(epoch_ms)), activity_id
+    except (ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def aggregate_dashboard_stats(user_id: str) -> DashboardStats:
+    """Compute dashboard stats directly from a user's activities"""
+    now = datetime.now(timezone.utc)
+    current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    thirty_days_ago = now - timedelta(days=30)
+    
+    # Reduce server-side: one pass over the user's activities, three sums back
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$facet": {
+            "totals": [
+                {"$group": {"_id": None, "emissions": {"$sum": "$carbon_footprint_kg"}, "count": {"$sum": 1}}}
+            ],
+            "current_month": [
+                {"$match": {"date": {"$gte": current_month}}},
+                {"$group": {"_id": None, "emissions": {"$sum": "$carbon_footprint_kg"}}}
+            ],
+            "last_30_days": [
+                {"$match": {"date": {"$gte": thirty_days_ago}}},
+                {"$group": {"_id": None, "emissions": {"$sum": "$carbon_footprint_kg"}}}
+            ]
+        }}
+    ]
+    facets = (await db.activities.aggregate(pipeline).to_list(1))[0]
+    
+    if not facets["totals"]:
+        return DashboardStats(
+            total_emissions=0,
+            total_activities=0,
+            avg_daily_emissions=0,
+            current_month_emissions=0
+        )
+    
+    total_emissions = facets["totals"][0]["emissions"]
+    total_activities = facets["totals"][0]["count"]
+    current_month_emissions = facets["current_month"][0]["emissions"] if facets["current_month"] else 0
+    
+    # Average daily emissions over the last 30 days
+    avg_daily_emissions = facets["last_30_days"][0]["emissions"] / 30 if facets["last_30_days"] else 0
+    
+    return DashboardStats(
+        total_emissions=round(total_emissions, 3),
+        total_activities=total_activities,
+        avg_daily_emissions=round(avg_daily_emissions, 3),
+        current_month_emissions=round(current_month_emissions, 3)
+    )
+
+async def record_user_stats(user_id: str, activities: List[Activity]):
+    """Fold new activities into the user's running emission counters"""
+    increments = {"total": 0.0, "count": 0}
+    for activity in activities:
+        # Naive dates are stored as UTC by Mongo, so bucket them the same way
+        date = activity.date if activity.date.tzinfo is None else activity.date.astimezone(timezone.utc)
+        month_field = f"month.{date.strftime('%Y-%m')}"
+        increments["total"] += activity.carbon_footprint_kg
+        increments["count"] += 1
+        increments[month_field] = increments.get(month_field, 0) + activity.carbon_footprint_kg
+    await db.user_stats.update_one({"user_id": user_id}, {"$inc": increments}, upsert=True)
+
+async def insert_activities(user_id: str, activities: List[Activity]):
+    """Insert many activities and count every one that was actually written"""
+    try:
+        await db.activities.insert_many([activity.model_dump() for activity in activities], ordered=False)
+    except BulkWriteError as e:
+        # Unordered inserts keep going past failures; only the failed indexes are missing
+        failed = {error["index"] for error in e.details.get("writeErrors", [])}
+        inserted = [activity for index, activity in enumerate(activities) if index not in failed]
+        if inserted:
+            await record_user_stats(user_id, inserted)
+        raise HTTPException(status_code=500, detail=f"{len(failed)} of {len(activities)} activities could not be saved")
+    await record_user_stats(user_id, activities)
 
 # Authentication Routes
 @api_router.post("/auth/register", response_model=Token)
 async def register(user_data: UserCreate):
-    # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Create user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await asyncio.to_thread(hash_password, user_data.password)
     user = User(email=user_data.email, name=user_data.name)
     
-    user_dict = user.dict()
+    user_dict = user.model_dump()
     user_dict["password"] = hashed_password
-    user_dict = prepare_for_mongo(user_dict)
     
-    await db.users.insert_one(user_dict)
+    # The unique index on email rejects duplicates atomically
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create access token
     access_token = create_access_token(data={"sub": user.id})
@@ -177,7 +308,7 @@ async def register(user_data: UserCreate):
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_data: UserLogin):
     user = await db.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user["password"]):
+    if not user or not await asyncio.to_thread(verify_password, user_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     access_token = create_access_token(data={"sub": user["id"]})
@@ -190,63 +321,116 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 # Activity Routes
 @api_router.post("/activities", response_model=Activity)
 async def create_activity(activity_data: ActivityCreate, current_user: User = Depends(get_current_user)):
-    carbon_footprint = calculate_carbon_footprint(activity_data.transport_type, activity_data.distance_km)
-    
-    activity = Activity(
-        user_id=current_user.id,
-        transport_type=activity_data.transport_type,
-        distance_km=activity_data.distance_km,
-        carbon_footprint_kg=carbon_footprint,
-        date=activity_data.date,
-        description=activity_data.description
-    )
+    activity = build_activity(current_user.id, activity_data)
     
-    activity_dict = prepare_for_mongo(activity.dict())
-    await db.activities.insert_one(activity_dict)
+    await db.activities.insert_one(activity.model_dump())
+    await record_user_stats(current_user.id, [activity])
     
     return activity
 
-@api_router.get("/activities", response_model=List[Activity])
-async def get_activities(current_user: User = Depends(get_current_user)):
-    activities = await db.activities.find({"user_id": current_user.id}).sort("date", -1).to_list(1000)
-    return [Activity(**parse_from_mongo(activity)) for activity in activities]
+@api_router.post("/activities/bulk", response_model=List[Activity])
+async def create_activities_bulk(bulk_data: ActivityBulk, current_user: User = Depends(get_current_user)):
+    """Create many activities in a single round trip"""
+    activities = [build_activity(current_user.id, item) for item in bulk_data.items]
+    
+    if activities:
+        await insert_activities(current_user.id, activities)
+    
+    return activities
 
-@api_router.get("/dashboard/stats", response_model=DashboardStats)
-async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
-    activities = await db.activities.find({"user_id": current_user.id}).to_list(1000)
+@api_router.post("/activities/import")
+async def import_activities(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+    """Import historical activities from a CSV with transport_type, distance_km, date and optional description columns"""
+    try:
+        reader = csv.DictReader(io.StringIO((await file.read()).decode('utf-8-sig')))
+        # Read one row past the cap so oversized files are detected without parsing them fully
+        rows = list(itertools.islice(reader, MAX_BULK_ACTIVITIES + 1))
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=400, detail="File is not a valid UTF-8 CSV")
     
-    if not activities:
-        return DashboardStats(
-            total_emissions=0,
-            total_activities=0,
-            avg_daily_emissions=0,
-            current_month_emissions=0
-        )
+    if len(rows) > MAX_BULK_ACTIVITIES:
+        raise HTTPException(status_code=400, detail=f"CSV imports are limited to {MAX_BULK_ACTIVITIES} rows")
     
-    total_emissions = sum(activity["carbon_footprint_kg"] for activity in activities)
-    total_activities = len(activities)
+    codes, distances, dates = [], [], []
+    for line_number, row in enumerate(rows, start=2):
+        try:
+            codes.append(TRANSPORT_CODES[row["transport_type"].strip().lower()])
+            distance = float(row["distance_km"])
+            # NaN/inf/negative distances would poison the user's running counters
+            if not math.isfinite(distance) or distance < 0:
+                raise ValueError(distance)
+            distances.append(distance)
+            dates.append(datetime.fromisoformat(row["date"].strip().replace('Z', '+00:00')))
+        except (KeyError, ValueError, AttributeError):
+            raise HTTPException(status_code=400, detail=f"Invalid activity on CSV line {line_number}")
+    
+    # One vectorized multiply for every row; rounding uses Python's round() so half values
+    # come out exactly as calculate_carbon_footprint stores them (np.round differs)
+    products = EMISSION_FACTOR_ARRAY[np.asarray(codes, dtype=np.int8)] * np.asarray(distances)
+    footprints = [round(product, 3) for product in products.tolist()]
     
-    # Calculate current month emissions
-    current_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    current_month_activities = [
-        activity for activity in activities 
-        if isinstance(activity.get("date"), str) and 
-        datetime.fromisoformat(activity["date"].replace('Z', '+00:00')) >= current_month
+    activities = [
+        Activity(
+            user_id=current_user.id,
+            transport_type=TRANSPORT_TYPES[code],
+            distance_km=distance,
+            carbon_footprint_kg=footprint,
+            date=date,
+            description=row.get("description") or None
+        )
+        for code, distance, footprint, date, row in zip(codes, distances, footprints, dates, rows)
     ]
-    current_month_emissions = sum(activity["carbon_footprint_kg"] for activity in current_month_activities)
     
-    # Calculate average daily emissions (last 30 days)
-    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-    recent_activities = [
-        activity for activity in activities 
-        if isinstance(activity.get("date"), str) and 
-        datetime.fromisoformat(activity["date"].replace('Z', '+00:00')) >= thirty_days_ago
+    if activities:
+        await insert_activities(current_user.id, activities)
+    
+    return {"imported": len(activities)}
+
+@api_router.get("/activities", response_model=List[Activity])
+async def get_activities(
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """List activities newest first; pass the X-Next-Cursor header back as `cursor` for the next page"""
+    query = {"user_id": current_user.id}
+    if cursor:
+        date, activity_id = parse_activity_cursor(cursor)
+        query["$or"] = [{"date": {"$lt": date}}, {"date": date, "id": {"$lt": activity_id}}]
+    
+    # Fetch one extra document to learn whether another page exists
+    activities = await db.activities.find(query).sort([("date", -1), ("id", -1)]).limit(limit + 1).to_list(limit + 1)
+    headers = {}
+    if len(activities) > limit:
+        activities = activities[:limit]
+        headers["X-Next-Cursor"] = activity_cursor(activities[-1])
+    
+    body = ACTIVITY_LIST.dump_json(ACTIVITY_LIST.validate_python(activities))
+    return Response(body, media_type="application/json", headers=headers)
+
+@api_router.get("/dashboard/stats", response_model=DashboardStats)
+async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
+    stats = await db.user_stats.find_one({"user_id": current_user.id})
+    if stats is None:
+        return await aggregate_dashboard_stats(current_user.id)
+    
+    # Totals come from the running counters; only the rolling 30-day window is summed
+    now = datetime.now(timezone.utc)
+    month_key = now.strftime("%Y-%m")
+    current_month_emissions = stats.get("month", {}).get(month_key, 0)
+    
+    # Average daily emissions over the last 30 days
+    thirty_days_ago = now - timedelta(days=30)
+    pipeline = [
+        {"$match": {"user_id": current_user.id, "date": {"$gte": thirty_days_ago}}},
+        {"$group": {"_id": None, "emissions": {"$sum": "$carbon_footprint_kg"}}}
     ]
-    avg_daily_emissions = sum(activity["carbon_footprint_kg"] for activity in recent_activities) / 30 if recent_activities else 0
+    recent = await db.activities.aggregate(pipeline).to_list(1)
+    avg_daily_emissions = recent[0]["emissions"] / 30 if recent else 0
     
     return DashboardStats(
-        total_emissions=round(total_emissions, 3),
-        total_activities=total_activities,
+        total_emissions=round(stats["total"], 3),
+        total_activities=stats["count"],
         avg_daily_emissions=round(avg_daily_emissions, 3),
         current_month_emissions=round(current_month_emissions, 3)
     )
@@ -254,67 +438,52 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
 @api_router.get("/activities/chart-data")
 async def get_chart_data(period: str = "weekly", current_user: User = Depends(get_current_user)):
     """Get emissions data for charts (daily, weekly, or monthly)"""
-    activities = await db.activities.find({"user_id": current_user.id}).to_list(1000)
-    
-    # Parse activities and sort by date
-    parsed_activities = []
-    for activity in activities:
-        try:
-            if isinstance(activity.get("date"), str):
-                activity["date"] = datetime.fromisoformat(activity["date"].replace('Z', '+00:00'))
-                parsed_activities.append(activity)
-        except:
-            continue
-    
-    parsed_activities.sort(key=lambda x: x["date"])
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
     
-    # Group by period
-    chart_data = []
+    # Start of every period to report, most recent first
+    period_starts = []
     if period == "daily":
         # Last 30 days
+        unit, label_format = "day", "%Y-%m-%d"
         for i in range(30):
-            date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=i)
-            day_emissions = sum(
-                activity["carbon_footprint_kg"] for activity in parsed_activities
-                if activity["date"].date() == date.date()
-            )
-            chart_data.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "emissions": round(day_emissions, 3)
-            })
+            period_starts.append(today - timedelta(days=i))
     
     elif period == "weekly":
         # Last 12 weeks
+        unit, label_format = "week", "%Y-W%U"
         for i in range(12):
-            week_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(weeks=i)
+            week_start = today - timedelta(weeks=i)
             week_start = week_start - timedelta(days=week_start.weekday())  # Start of week (Monday)
-            week_end = week_start + timedelta(days=7)
-            
-            week_emissions = sum(
-                activity["carbon_footprint_kg"] for activity in parsed_activities
-                if week_start <= activity["date"] < week_end
-            )
-            chart_data.append({
-                "date": week_start.strftime("%Y-W%U"),
-                "emissions": round(week_emissions, 3)
-            })
+            period_starts.append(week_start)
     
     else:  # monthly
         # Last 12 months
+        unit, label_format = "month", "%Y-%m"
         for i in range(12):
-            month_date = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            month_date = month_date.replace(month=month_date.month - i if month_date.month > i else 12 + month_date.month - i)
-            if month_date.month > datetime.now(timezone.utc).month:
-                month_date = month_date.replace(year=month_date.year - 1)
-            
-            month_emissions = sum(
-                activity["carbon_footprint_kg"] for activity in parsed_activities
-                if activity["date"].year == month_date.year and activity["date"].month == month_date.month
-            )
-            chart_data.append({
-                "date": month_date.strftime("%Y-%m"),
-                "emissions": round(month_emissions, 3)
-            })
+            # Count months since year 0 so stepping back across January needs no special case
+            month_index = today.year * 12 + today.month - 1 - i
+            period_starts.append(today.replace(year=month_index // 12, month=month_index % 12 + 1, day=1))
+    
+    # Bucket emissions server-side; each bucket key is the UTC start of its period
+    date_trunc = {"date": "$date", "unit": unit}
+    if unit == "week":
+        date_trunc["startOfWeek"] = "monday"
+    pipeline = [
+        {"$match": {"user_id": current_user.id, "date": {"$gte": min(period_starts)}}},
+        {"$group": {"_id": {"$dateTrunc": date_trunc}, "emissions": {"$sum": "$carbon_footprint_kg"}}}
+    ]
+    buckets = {
+        bucket["_id"]: bucket["emissions"]
+        for bucket in await db.activities.aggregate(pipeline).to_list(None)
+    }
+    
+    chart_data = [
+        {
+            "date": period_start.strftime(label_format),
+            "emissions": round(buckets.get(period_start, 0), 3)
+        }
+        for period_start in period_starts
+    ]
     
     return {"data": list(reversed(chart_data))}
 
@@ -327,8 +496,11 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -336,6 +508,45 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    await db.users.create_index("email", unique=True)
+    await db.users.create_index("id", unique=True)
+    await db.activities.create_index([("user_id", 1), ("date", -1), ("id", -1)])
+    await db.user_stats.create_index("user_id", unique=True)
+
+@app.on_event("startup")
+async def migrate_string_dates():
+    """Convert datetimes stored as ISO strings by older versions to native BSON dates"""
+    for collection, fields in ((db.activities, ("date", "created_at")), (db.users, ("created_at",))):
+        for field in fields:
+            await collection.update_many(
+                {field: {"$type": "string"}},
+                [{"$set": {field: {"$toDate": f"${field}"}}}]
+            )
+
+@app.on_event("startup")
+async def backfill_user_stats():
+    """Build running counters from existing activities the first time they are enabled"""
+    if await db.user_stats.estimated_document_count() > 0:
+        return
+    pipeline = [
+        {"$group": {
+            "_id": {"user_id": "$user_id", "month": {"$dateToString": {"format": "%Y-%m", "date": "$date"}}},
+            "emissions": {"$sum": "$carbon_footprint_kg"},
+            "count": {"$sum": 1}
+        }},
+        {"$group": {
+            "_id": "$_id.user_id",
+            "total": {"$sum": "$emissions"},
+            "count": {"$sum": "$count"},
+            "month": {"$push": {"k": "$_id.month", "v": "$emissions"}}
+        }},
+        {"$project": {"_id": 0, "user_id": "$_id", "total": 1, "count": 1, "month": {"$arrayToObject": "$month"}}},
+        {"$merge": {"into": "user_stats", "on": "user_id", "whenMatched": "keepExisting", "whenNotMatched": "insert"}}
+    ]
+    await db.activities.aggregate(pipeline).to_list(None)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
\ No newline at end of file
@@ -12,8 +12,7 @@ def create_screenshot_placeholders():
     """Create placeholder screenshots for GitHub README"""
     screenshots_dir = "screenshots"
     
-    if not os.path.exists(screenshots_dir):
-        os.makedirs(screenshots_dir)
+    os.makedirs(screenshots_dir, exist_ok=True)
     
     # Create placeholder files
     placeholders = [
@@ -26,14 +25,18 @@ def create_screenshot_placeholders():
     
     placeholder_content = b"PLACEHOLDER_IMAGE"
     
+    # One directory read instead of a stat per placeholder
+    with os.scandir(screenshots_dir) as entries:
+        existing = {entry.name for entry in entries}
+    
     for placeholder in placeholders:
         filepath = os.path.join(screenshots_dir, placeholder)
-        if not os.path.exists(filepath):
-            with open(filepath, "wb") as f:
-                f.write(placeholder_content)
-            print(f"✅ Created placeholder: {filepath}")
-        else:
+        if placeholder in existing:
             print(f"📸 Screenshot exists: {filepath}")
+            continue
+        with open(filepath, "wb") as f:
+            f.write(placeholder_content)
+        print(f"✅ Created placeholder: {filepath}")
 
 def main():
     print("🖼️  EcoTrack Screenshot Generator")